@@ -1,6 +1,32 @@
 """PipelineAtlas AI Strategy Layer — LLM-powered modernization insights."""
 
+from typing import TYPE_CHECKING
+
 __version__ = "0.1.0"
 
-from atlas_ai.advisor import ModernizationAdvisor, ModernizationResult  # noqa: F401
-from atlas_ai.llm_client import LLMClient, LLMConfig, LLMResponse  # noqa: F401
+if TYPE_CHECKING:
+    from atlas_ai.advisor import ModernizationAdvisor, ModernizationResult  # noqa: F401
+    from atlas_ai.llm_client import LLMClient, LLMConfig, LLMResponse  # noqa: F401
+
+# Public names re-exported lazily (PEP 562) so that importing atlas_ai —
+# e.g. for `python -m atlas_ai --info` — doesn't pay for httpx.
+_LAZY_EXPORTS = {
+    "ModernizationAdvisor": "atlas_ai.advisor",
+    "ModernizationResult": "atlas_ai.advisor",
+    "LLMClient": "atlas_ai.llm_client",
+    "LLMConfig": "atlas_ai.llm_client",
+    "LLMResponse": "atlas_ai.llm_client",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    return getattr(importlib.import_module(module_name), name)
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
@@ -6,27 +6,36 @@ Usage:
     python -m atlas_ai --info              # Print configuration and exit
 
 Environment variables:
-    LLM_PROVIDER      - "ollama" or "openai" (default: ollama)
+    LLM_PROVIDER      - "ollama", "openai", or "vllm" (default: ollama)
     LLM_BASE_URL      - Base URL for LLM (default: http://localhost:11434)
     LLM_MODEL         - Model name (default: mistral)
     LLM_API_KEY       - API key for OpenAI (default: "")
     LLM_MAX_TOKENS    - Max tokens per response (default: 2048)
     LLM_TIMEOUT       - Request timeout in seconds (default: 120)
     ATLAS_AI_MODE     - "stdin" or "stream" (default: stdin)
+    ATLAS_AI_CONCURRENCY - Worker threads for stream mode (default: 4)
+    ATLAS_AI_BATCH_SIZE - Reports fused into one LLM call in stream mode (default: 4)
+    ATLAS_AI_MAX_FINDINGS - Findings included per prompt, top-by-severity (default: 25)
+    ATLAS_AI_MAX_CONCURRENT - In-flight LLM requests per client (default: 4)
     ATLAS_REDIS_URL   - Redis URL for stream mode (default: redis://localhost:6379)
 """
 
 from __future__ import annotations
 
 import argparse
-import json
 import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING
+
+import orjson
 
-from atlas_ai.advisor import ModernizationAdvisor
 from atlas_ai.llm_client import LLMConfig
 
+if TYPE_CHECKING:
+    from atlas_ai.advisor import ModernizationAdvisor
+
 logging.basicConfig(level=logging.INFO, format="%(name)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
@@ -46,10 +55,14 @@ def _config_from_env() -> LLMConfig:
 def run_stdin(advisor: ModernizationAdvisor) -> None:
     """Read a JSON report from stdin, analyze it, and print the result to stdout."""
     logger.info("Reading report from stdin...")
+    # Read raw bytes in 1 MiB chunks — no Python-level UTF-8 decode (orjson
+    # validates while parsing) and no single giant read() allocation.
+    buf = bytearray()
+    while chunk := sys.stdin.buffer.read(1 << 20):
+        buf += chunk
     try:
-        raw = sys.stdin.read()
-        report_json = json.loads(raw)
-    except json.JSONDecodeError as exc:
+        report_json = orjson.loads(buf)
+    except orjson.JSONDecodeError as exc:
         logger.error("Failed to parse JSON from stdin: %s", exc)
         sys.exit(1)
 
@@ -60,19 +73,67 @@ def run_stdin(advisor: ModernizationAdvisor) -> None:
         "roadmap": result.roadmap,
         "executive_summary": result.executive_summary,
     }
-    print(json.dumps(output, indent=2))
+    sys.stdout.buffer.write(orjson.dumps(output, option=orjson.OPT_INDENT_2) + b"\n")
+
+
+def _emit_usage(advisor: ModernizationAdvisor, client, report_json, result) -> None:
+    """Publish a token-usage event for one analyzed report."""
+    from atlas_sdk.events import AITokenUsageEvent
+    tenant_id = report_json.get("metadata", {}).get("tenant_id", "default")
+    usage_event = AITokenUsageEvent(
+        tenant_id=tenant_id,
+        provider=advisor._client.config.provider,
+        model=result.model,
+        tokens_used=result.tokens_used
+    )
+    client.xadd("atlas.ai.usage", {"payload": usage_event.model_dump_json()})
+
+
+def _process_batch(advisor: ModernizationAdvisor, client, entries) -> None:
+    """Analyze a chunk of stream entries with one batched LLM call.
+
+    Runs on a worker thread; LLMClient's underlying httpx.Client is
+    thread-safe, as is the redis client used for the usage events.
+    """
+    reports = [orjson.loads(fields.get(b"payload", b"{}")) for _msg_id, fields in entries]
+    # Guard per-message logging so format args aren't built when INFO is off
+    info_enabled = logger.isEnabledFor(logging.INFO)
+    if info_enabled:
+        logger.info(
+            "Analyzing batch of %d report(s), first message %s", len(reports), entries[0][0]
+        )
+    results = advisor.analyze_batch(reports)
+    for report_json, result in zip(reports, results):
+        if info_enabled:
+            logger.info(
+                "Analysis complete: %d tokens, model=%s",
+                result.tokens_used,
+                result.model,
+            )
+        _emit_usage(advisor, client, report_json, result)
 
 
 def run_stream(advisor: ModernizationAdvisor, redis_url: str) -> None:
-    """Consume the atlas.reports.ready Redis stream and analyze each report."""
+    """Consume the atlas.reports.ready Redis stream and analyze each report.
+
+    Entries are read in batches, grouped into chunks of ATLAS_AI_BATCH_SIZE
+    (each chunk becoming one batched LLM call), and chunks are dispatched to
+    a thread pool so calls for backed-up reports overlap instead of running
+    strictly serially; messages are acked as their chunk finishes.
+    """
     import redis as _redis
 
     logger.info("Connecting to Redis at %s ...", redis_url)
-    client = _redis.from_url(redis_url, decode_responses=True)
+    # No decode_responses: only the payload needs parsing, and orjson takes
+    # bytes directly; message IDs pass back to xack as bytes unchanged, so
+    # decoding every field of every entry would be pure overhead.
+    client = _redis.from_url(redis_url)
 
     stream_name = "atlas.reports.ready"
     group_name = "atlas-ai"
     consumer_name = "atlas-ai-1"
+    concurrency = int(os.environ.get("ATLAS_AI_CONCURRENCY", "4"))
+    batch_size = int(os.environ.get("ATLAS_AI_BATCH_SIZE", "4"))
 
     # Create consumer group if it doesn't exist yet
     try:
@@ -81,41 +142,52 @@ def run_stream(advisor: ModernizationAdvisor, redis_url: str) -> None:
         if "BUSYGROUP" not in str(exc):
             raise
 
-    logger.info("Listening on stream '%s' (group=%s)...", stream_name, group_name)
-    while True:
-        try:
-            messages = client.xreadgroup(
-                group_name, consumer_name, {stream_name: ">"}, count=1, block=5000
-            )
-            if not messages:
-                continue
-            for _stream, entries in messages:
-                for msg_id, fields in entries:
-                    try:
-                        report_json = json.loads(fields.get("payload", "{}"))
-                        logger.info("Analyzing report from message %s", msg_id)
-                        result = advisor.analyze(report_json)
-                        logger.info(
-                            "Analysis complete: %d tokens, model=%s",
-                            result.tokens_used,
-                            result.model,
-                        )
-                        from atlas_sdk.events import AITokenUsageEvent
-                        tenant_id = report_json.get("metadata", {}).get("tenant_id", "default")
-                        usage_event = AITokenUsageEvent(
-                            tenant_id=tenant_id,
-                            provider=advisor._client.config.provider,
-                            model=result.model,
-                            tokens_used=result.tokens_used
+    logger.info(
+        "Listening on stream '%s' (group=%s, concurrency=%d)...",
+        stream_name,
+        group_name,
+        concurrency,
+    )
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        while True:
+            try:
+                messages = client.xreadgroup(
+                    group_name,
+                    consumer_name,
+                    {stream_name: ">"},
+                    count=max(32, concurrency * batch_size),
+                    block=30000,
+                )
+                if not messages:
+                    continue
+                pending = [
+                    (msg_id, fields)
+                    for _stream, entries in messages
+                    for msg_id, fields in entries
+                ]
+                futures = {}
+                for start in range(0, len(pending), batch_size):
+                    chunk = pending[start:start + batch_size]
+                    future = executor.submit(_process_batch, advisor, client, chunk)
+                    futures[future] = [msg_id for msg_id, _fields in chunk]
+                for future in as_completed(futures):
+                    msg_ids = futures[future]
+                    exc = future.exception()
+                    if exc is not None:
+                        logger.error(
+                            "Failed to analyze messages %s: %s", msg_ids, exc, exc_info=exc
                         )
-                        client.xadd("atlas.ai.usage", {"payload": usage_event.model_dump_json()})
-                    except Exception as exc:  # noqa: BLE001
-                        logger.error("Failed to analyze message %s: %s", msg_id, exc)
-                    finally:
-                        client.xack(stream_name, group_name, msg_id)
-        except KeyboardInterrupt:
-            logger.info("Shutting down stream consumer.")
-            break
+                    # One round-trip per chunk instead of one per message
+                    with client.pipeline(transaction=False) as pipe:
+                        for msg_id in msg_ids:
+                            pipe.xack(stream_name, group_name, msg_id)
+                        pipe.execute()
+            except KeyboardInterrupt:
+                logger.info("Shutting down stream consumer.")
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 def main() -> None:
@@ -140,6 +212,9 @@ def main() -> None:
         print(f"  Mode:      {args.mode}")
         return
 
+    # Imported here so --info/--help above never pay for httpx
+    from atlas_ai.advisor import ModernizationAdvisor
+
     advisor = ModernizationAdvisor(config=cfg)
     try:
         if args.mode == "stream":
@@ -6,7 +6,10 @@ modernization roadmaps, executive summaries, and improvement plans.
 
 from __future__ import annotations
 
+import json
 import logging
+import os
+import re
 from dataclasses import dataclass
 from typing import Any
 
@@ -14,11 +17,113 @@ from atlas_ai.llm_client import LLMClient, LLMConfig, LLMResponse
 from atlas_ai.prompts import (
     SYSTEM_PROMPT,
     build_analysis_prompt,
+    build_batch_prompt,
+    build_combined_prompt,
     build_executive_summary_prompt,
 )
 
 logger = logging.getLogger(__name__)
 
+_JSON_BLOCK_RE = re.compile(r"\{.*\}", re.DOTALL)
+_JSON_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+
+# Reports with near-zero scores and no findings get a templated result
+# instead of an LLM round-trip; set ATLAS_AI_SKIP_TRIVIAL=0 to disable.
+_SKIP_TRIVIAL = os.environ.get("ATLAS_AI_SKIP_TRIVIAL", "1") != "0"
+_TRIVIAL_SCORE_CEILING = 10
+
+_TRIVIAL_ROADMAP = (
+    "## Modernization Roadmap\n\n"
+    "Pipeline '{name}' is small, scored well, and produced no findings; no "
+    "modernization work is recommended at this time. Re-run the analysis "
+    "after the pipeline grows or its scores change."
+)
+_TRIVIAL_SUMMARY = (
+    "Pipeline '{name}' is healthy: complexity {complexity}/100, fragility "
+    "{fragility}/100, and no rule findings. No action is needed."
+)
+
+
+def _is_trivial(report_json: dict[str, Any]) -> bool:
+    """True if the report's summary is mechanically derivable without an LLM."""
+    if report_json.get("findings"):
+        return False
+    scores = report_json.get("scores", {})
+    return (
+        scores.get("complexity_score", 0) < _TRIVIAL_SCORE_CEILING
+        and scores.get("fragility_score", 0) < _TRIVIAL_SCORE_CEILING
+    )
+
+
+def _trivial_result(report_json: dict[str, Any]) -> ModernizationResult:
+    """Deterministic templated result for a trivial report."""
+    name = report_json.get("meta", {}).get("name", "Unknown Pipeline")
+    scores = report_json.get("scores", {})
+    return ModernizationResult(
+        roadmap=_TRIVIAL_ROADMAP.format(name=name),
+        executive_summary=_TRIVIAL_SUMMARY.format(
+            name=name,
+            complexity=scores.get("complexity_score", 0),
+            fragility=scores.get("fragility_score", 0),
+        ),
+        tokens_used=0,
+        model="deterministic",
+    )
+
+
+def _split_combined_response(content: str) -> tuple[str, str]:
+    """Split a fused-call response into (roadmap, executive_summary).
+
+    The model is instructed to return a strict JSON object, but LLM output
+    is not guaranteed; fall back to extracting the first ``{...}`` block,
+    and finally to treating the whole response as the roadmap.
+    """
+    candidates = [content]
+    match = _JSON_BLOCK_RE.search(content)
+    if match:
+        candidates.append(match.group(0))
+
+    for candidate in candidates:
+        try:
+            parsed = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            return (
+                str(parsed.get("roadmap", "")),
+                str(parsed.get("executive_summary", "")),
+            )
+
+    logger.warning("Combined response was not valid JSON; returning raw content as roadmap")
+    return content, ""
+
+
+def _parse_batch_response(content: str, expected: int) -> list[dict[str, Any]] | None:
+    """Parse a batch response into one dict per report, or None on failure.
+
+    Same defensive strategy as _split_combined_response: try the content
+    as-is, then the first ``[...]`` block. The array must contain exactly
+    one object per report so results can be mapped back by index.
+    """
+    candidates = [content]
+    match = _JSON_ARRAY_RE.search(content)
+    if match:
+        candidates.append(match.group(0))
+
+    for candidate in candidates:
+        try:
+            parsed = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if (
+            isinstance(parsed, list)
+            and len(parsed) == expected
+            and all(isinstance(item, dict) for item in parsed)
+        ):
+            return parsed
+
+    return None
+
 
 @dataclass
 class ModernizationResult:
@@ -46,37 +151,120 @@ class ModernizationAdvisor:
     def analyze(self, report_json: dict[str, Any]) -> ModernizationResult:
         """Run a full modernization analysis from a JSON report.
 
+        The roadmap and executive summary share almost all of their context
+        (the report itself), so both are generated in a single fused LLM call
+        that returns a JSON object — one network round-trip and one prefill
+        pass instead of two. Trivial reports (near-zero scores, no findings)
+        skip the LLM entirely and get a deterministic templated result.
+
         Args:
             report_json: The JSON report dict from atlas-report's JSON renderer.
 
         Returns:
             ModernizationResult with roadmap and executive summary.
         """
-        total_tokens = 0
+        if _SKIP_TRIVIAL and _is_trivial(report_json):
+            logger.info("Report is trivial; returning deterministic result without LLM call")
+            return _trivial_result(report_json)
+
+        combined_prompt = build_combined_prompt(report_json)
+        response = self._client.generate(SYSTEM_PROMPT, combined_prompt)
+        return self._result_from_response(response)
+
+    async def analyze_async(self, report_json: dict[str, Any]) -> ModernizationResult:
+        """Async variant of analyze(), for callers with a long-lived event loop.
+
+        Synchronous callers should use analyze(), which stays on the sync HTTP
+        client rather than spinning up a throwaway event loop per call.
+        """
+        if _SKIP_TRIVIAL and _is_trivial(report_json):
+            logger.info("Report is trivial; returning deterministic result without LLM call")
+            return _trivial_result(report_json)
 
-        # Generate full analysis
-        analysis_prompt = build_analysis_prompt(report_json)
-        roadmap_response = self._client.generate(SYSTEM_PROMPT, analysis_prompt)
-        total_tokens += roadmap_response.tokens_used
+        combined_prompt = build_combined_prompt(report_json)
+        response = await self._client.agenerate(SYSTEM_PROMPT, combined_prompt)
+        return self._result_from_response(response)
 
-        # Generate executive summary
-        summary_prompt = build_executive_summary_prompt(report_json)
-        summary_response = self._client.generate(SYSTEM_PROMPT, summary_prompt)
-        total_tokens += summary_response.tokens_used
+    def _result_from_response(self, response: LLMResponse) -> ModernizationResult:
+        """Split a fused-call response and wrap it in a ModernizationResult."""
+        roadmap, summary = _split_combined_response(response.content)
 
         logger.info(
             "Modernization analysis complete: %d tokens used (model: %s)",
-            total_tokens,
-            roadmap_response.model,
+            response.tokens_used,
+            response.model,
         )
 
         return ModernizationResult(
-            roadmap=roadmap_response.content,
-            executive_summary=summary_response.content,
-            tokens_used=total_tokens,
-            model=roadmap_response.model,
+            roadmap=roadmap,
+            executive_summary=summary,
+            tokens_used=response.tokens_used,
+            model=response.model,
         )
 
+    def analyze_batch(self, reports: list[dict[str, Any]]) -> list[ModernizationResult]:
+        """Analyze several reports with a single batched LLM call.
+
+        Concatenating the reports into one prompt amortizes model prefill and
+        network round-trips across the batch. If the model's response can't be
+        mapped back to the inputs, each report is re-analyzed individually.
+
+        Args:
+            reports: Report dicts from atlas-report's JSON renderer.
+
+        Returns:
+            One ModernizationResult per report, in input order.
+        """
+        if not reports:
+            return []
+        if len(reports) == 1:
+            return [self.analyze(reports[0])]
+
+        batch_prompt = build_batch_prompt(reports)
+        response = self._client.generate(SYSTEM_PROMPT, batch_prompt)
+        parsed = _parse_batch_response(response.content, len(reports))
+        if parsed is None:
+            logger.warning(
+                "Batch response for %d reports was not a parseable JSON array; "
+                "falling back to per-report analysis",
+                len(reports),
+            )
+            return self._analyze_each(reports)
+
+        # Token usage is only reported for the whole call; attribute it evenly.
+        tokens_each = response.tokens_used // len(reports)
+        return [
+            ModernizationResult(
+                roadmap=str(item.get("roadmap", "")),
+                executive_summary=str(item.get("executive_summary", "")),
+                tokens_used=tokens_each,
+                model=response.model,
+            )
+            for item in parsed
+        ]
+
+    def _analyze_each(self, reports: list[dict[str, Any]]) -> list[ModernizationResult]:
+        """Analyze reports one combined prompt each, via generate_many.
+
+        When the backend supports multi-prompt requests
+        (LLMConfig.multi_prompt), all prompts still travel in a single HTTP
+        request; otherwise they fall back to sequential calls.
+        """
+        prompts = [build_combined_prompt(report) for report in reports]
+        responses = self._client.generate_many(SYSTEM_PROMPT, prompts)
+        results = []
+        for response in responses:
+            roadmap, summary = _split_combined_response(response.content)
+            results.append(
+                ModernizationResult(
+                    roadmap=roadmap,
+                    executive_summary=summary,
+                    tokens_used=response.tokens_used,
+                    model=response.model,
+                )
+            )
+        return results
+
     def generate_roadmap(self, report_json: dict[str, Any]) -> str:
         """Generate only the modernization roadmap."""
         prompt = build_analysis_prompt(report_json)
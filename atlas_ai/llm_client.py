@@ -6,26 +6,48 @@ never for parsing or extracting CI/CD structure.
 
 from __future__ import annotations
 
-import json
+import asyncio
+import hashlib
 import logging
-from dataclasses import dataclass, field
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING
 
-import httpx
+import orjson
+
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
+# Responses memoized by prompt digest, so retried/duplicate reports (consumer
+# rebalance, redelivery) don't hit the LLM twice. Bounded; disable entirely
+# with LLM_CACHE=0.
+_RESPONSE_CACHE_MAX = 128
+
+# Payloads are serialized with orjson and posted as raw bytes, bypassing
+# httpx's stdlib-json path; the content type must then be set explicitly.
+# Installed once as client-level default headers rather than per request.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 @dataclass
 class LLMConfig:
     """Configuration for the LLM backend."""
 
-    provider: str = "ollama"  # "ollama" or "openai"
+    provider: str = "ollama"  # "ollama", "openai", or "vllm"
     base_url: str = "http://localhost:11434"  # Ollama default
     model: str = "mistral"
     api_key: str = ""  # Required for OpenAI
     max_tokens: int = 2048
     temperature: float = 0.3
     timeout: int = 120
+    # Backend accepts a list of prompts in one request (OpenAI-compatible
+    # completions API, e.g. vLLM); lets generate_many() post a single HTTP
+    # request instead of one per prompt.
+    multi_prompt: bool = False
 
 
 @dataclass
@@ -39,11 +61,84 @@ class LLMResponse:
 
 
 class LLMClient:
-    """Unified LLM client supporting Ollama and OpenAI-compatible APIs."""
+    """Unified LLM client supporting Ollama and OpenAI-compatible APIs.
+
+    The "vllm" provider speaks the same OpenAI-compatible chat/completions
+    API; vLLM's continuous batching makes it the natural backend for the
+    advisor's batch mode (its concurrency knobs are --max-num-seqs and
+    --max-num-batched-tokens, the counterpart of OLLAMA_NUM_PARALLEL).
+    """
 
-    def __init__(self, config: LLMConfig | None = None) -> None:
+    def __init__(
+        self,
+        config: LLMConfig | None = None,
+        max_concurrent: int | None = None,
+    ) -> None:
+        # Deferred import: httpx dominates the package's import time, and
+        # config-only entry points (--info, --help) never construct a client.
+        import httpx
+
+        self._httpx = httpx
         self.config = config or LLMConfig()
-        self._client = httpx.Client(timeout=self.config.timeout)
+        # Long-poll-friendly pool: generous keep-alive so sequential stream-mode
+        # calls reuse connections instead of paying TLS handshakes, and HTTP/2
+        # so constant headers (e.g. Authorization) live in the HPACK table.
+        self._limits = httpx.Limits(
+            max_keepalive_connections=16,
+            max_connections=32,
+            keepalive_expiry=300.0,
+        )
+        self._headers = dict(_JSON_HEADERS)
+        if self.config.api_key:
+            self._headers["Authorization"] = f"Bearer {self.config.api_key}"
+        self._client: httpx.Client = httpx.Client(
+            timeout=self.config.timeout, http2=True, limits=self._limits, headers=self._headers
+        )
+        # Async clients are created lazily per running event loop: pooled
+        # keep-alive connections are bound to the loop they were opened on,
+        # so a single client shared across short-lived loops would hand out
+        # connections belonging to an already-closed loop.
+        self._loop_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._loop_lock = threading.Lock()
+        # System prompts are constant across calls (one or two distinct values
+        # per process); reuse the message dict so each payload serializes a
+        # shared reference instead of rebuilding it per request.
+        self._system_msgs: dict[str, dict] = {}
+        # Cap in-flight requests so the stream consumer's worker pool can't
+        # thundering-herd the backend (Ollama's OLLAMA_NUM_PARALLEL, OpenAI
+        # rate limits). The client is shared across threads; httpx.Client is
+        # thread-safe.
+        if max_concurrent is None:
+            max_concurrent = int(os.environ.get("ATLAS_AI_MAX_CONCURRENT", "4"))
+        self._max_concurrent = max_concurrent
+        self._sema = threading.BoundedSemaphore(max_concurrent)
+        # Async semaphores are created lazily per event loop (same reason as
+        # the per-loop clients: asyncio.Semaphore can't cross loops), keyed in
+        # a dict guarded by _loop_lock so concurrent loops don't clobber each
+        # other's semaphore and silently lift the cap.
+        self._loop_semas: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._cache_enabled = os.environ.get("LLM_CACHE", "1") != "0"
+        self._response_cache: OrderedDict[bytes, LLMResponse] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Everything in a request payload except the messages is constant for
+        # the lifetime of the client; build those skeletons once and merge the
+        # messages in per call, so orjson serializes shared references rather
+        # than freshly built dicts.
+        self._ollama_base = {
+            "model": self.config.model,
+            "stream": True,
+            "options": {
+                "num_predict": self.config.max_tokens,
+                "temperature": self.config.temperature,
+            },
+        }
+        self._openai_base = {
+            "model": self.config.model,
+            "max_tokens": self.config.max_tokens,
+            "temperature": self.config.temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
 
     def generate(self, system_prompt: str, user_prompt: str) -> LLMResponse:
         """Send a prompt to the LLM and return the response.
@@ -55,76 +150,323 @@ class LLMClient:
         Returns:
             LLMResponse with the generated content.
         """
-        if self.config.provider == "ollama":
-            return self._call_ollama(system_prompt, user_prompt)
-        elif self.config.provider == "openai":
-            return self._call_openai(system_prompt, user_prompt)
-        else:
-            raise ValueError(f"Unknown LLM provider: {self.config.provider}")
+        key = self._cache_lookup_key(system_prompt, user_prompt)
+        if key is not None:
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
 
-    def _call_ollama(self, system_prompt: str, user_prompt: str) -> LLMResponse:
-        """Call the Ollama /api/chat endpoint."""
-        url = f"{self.config.base_url}/api/chat"
+        with self._sema:
+            if self.config.provider == "ollama":
+                response = self._call_ollama(system_prompt, user_prompt)
+            elif self.config.provider in ("openai", "vllm"):
+                response = self._call_openai(system_prompt, user_prompt)
+            else:
+                raise ValueError(f"Unknown LLM provider: {self.config.provider}")
+
+        if key is not None:
+            self._cache_put(key, response)
+        return response
+
+    async def agenerate(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+        """Async variant of generate(), so independent prompts can run concurrently.
+
+        Args:
+            system_prompt: System-level instructions for the LLM.
+            user_prompt: The actual analysis query.
+
+        Returns:
+            LLMResponse with the generated content.
+        """
+        key = self._cache_lookup_key(system_prompt, user_prompt)
+        if key is not None:
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+
+        async with self._async_semaphore():
+            if self.config.provider == "ollama":
+                response = await self._acall_ollama(system_prompt, user_prompt)
+            elif self.config.provider in ("openai", "vllm"):
+                response = await self._acall_openai(system_prompt, user_prompt)
+            else:
+                raise ValueError(f"Unknown LLM provider: {self.config.provider}")
+
+        if key is not None:
+            self._cache_put(key, response)
+        return response
+
+    def generate_many(self, system_prompt: str, user_prompts: list[str]) -> list[LLMResponse]:
+        """Generate responses for several prompts sharing one system prompt.
+
+        When config.multi_prompt is set and the backend is OpenAI-compatible,
+        all prompts go out in a single /v1/completions request — the
+        completions API accepts a list of prompts, and servers like vLLM
+        schedule them as one batch. Otherwise falls back to sequential
+        generate() calls.
+
+        Args:
+            system_prompt: System-level instructions shared by all prompts.
+            user_prompts: The individual analysis queries.
+
+        Returns:
+            One LLMResponse per prompt, in input order.
+        """
+        if not user_prompts:
+            return []
+        if self.config.multi_prompt and self.config.provider in ("openai", "vllm"):
+            return self._call_openai_multi(system_prompt, user_prompts)
+        return [self.generate(system_prompt, prompt) for prompt in user_prompts]
+
+    def _call_openai_multi(self, system_prompt: str, user_prompts: list[str]) -> list[LLMResponse]:
+        """POST all prompts in one request to an OpenAI-compatible /v1/completions."""
+        url = f"{self.config.base_url}/v1/completions"
         payload = {
             "model": self.config.model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            "stream": False,
-            "options": {
-                "num_predict": self.config.max_tokens,
-                "temperature": self.config.temperature,
-            },
+            "prompt": [f"{system_prompt}\n\n{prompt}" for prompt in user_prompts],
+            "max_tokens": self.config.max_tokens,
+            "temperature": self.config.temperature,
         }
 
         try:
-            resp = self._client.post(url, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            return LLMResponse(
-                content=data.get("message", {}).get("content", ""),
+            with self._sema:
+                resp = self._client.post(url, content=orjson.dumps(payload))
+                resp.raise_for_status()
+                data = orjson.loads(resp.content)
+        except self._httpx.HTTPError as e:
+            logger.error("OpenAI error: %s", e)
+            raise RuntimeError(f"OpenAI request failed: {e}") from e
+
+        texts = [""] * len(user_prompts)
+        for choice in data.get("choices", []):
+            index = choice.get("index", 0)
+            if 0 <= index < len(texts):
+                texts[index] = choice.get("text", "")
+        # Usage is only reported for the whole request; attribute it evenly.
+        tokens_each = data.get("usage", {}).get("total_tokens", 0) // len(user_prompts)
+        return [
+            LLMResponse(
+                content=text,
                 model=self.config.model,
-                tokens_used=data.get("eval_count", 0),
-                provider="ollama",
+                tokens_used=tokens_each,
+                provider=self.config.provider,
             )
-        except httpx.HTTPError as e:
-            logger.error("Ollama error: %s", e)
-            raise RuntimeError(f"Ollama request failed: {e}") from e
+            for text in texts
+        ]
 
-    def _call_openai(self, system_prompt: str, user_prompt: str) -> LLMResponse:
-        """Call an OpenAI-compatible /v1/chat/completions endpoint."""
-        url = f"{self.config.base_url}/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.config.api_key}",
-            "Content-Type": "application/json",
+    def _cache_lookup_key(self, system_prompt: str, user_prompt: str) -> bytes | None:
+        """Digest identifying a (system, user) prompt pair, or None if caching is off."""
+        if not self._cache_enabled:
+            return None
+        return hashlib.blake2b(
+            system_prompt.encode() + b"\0" + user_prompt.encode()
+        ).digest()
+
+    def _cache_get(self, key: bytes) -> LLMResponse | None:
+        with self._cache_lock:
+            response = self._response_cache.get(key)
+            if response is None:
+                return None
+            self._response_cache.move_to_end(key)
+            return replace(response)
+
+    def _cache_put(self, key: bytes, response: LLMResponse) -> None:
+        with self._cache_lock:
+            self._response_cache[key] = response
+            if len(self._response_cache) > _RESPONSE_CACHE_MAX:
+                self._response_cache.popitem(last=False)
+
+    def _async_client(self) -> httpx.AsyncClient:
+        """Return the async HTTP client for the running event loop.
+
+        Created on first use per loop; state for loops that have since closed
+        is dropped (their pooled connections are unusable anyway).
+        """
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            client = self._loop_clients.get(loop)
+            if client is None:
+                for dead in [l for l in self._loop_clients if l.is_closed()]:
+                    del self._loop_clients[dead]
+                client = self._httpx.AsyncClient(
+                    timeout=self.config.timeout,
+                    http2=True,
+                    limits=self._limits,
+                    headers=self._headers,
+                )
+                self._loop_clients[loop] = client
+            return client
+
+    def _async_semaphore(self) -> asyncio.Semaphore:
+        """Return the in-flight semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            sema = self._loop_semas.get(loop)
+            if sema is None:
+                for dead in [l for l in self._loop_semas if l.is_closed()]:
+                    del self._loop_semas[dead]
+                sema = asyncio.Semaphore(self._max_concurrent)
+                self._loop_semas[loop] = sema
+            return sema
+
+    def _system_message(self, system_prompt: str) -> dict:
+        """Return the (cached) message dict for a system prompt."""
+        msg = self._system_msgs.get(system_prompt)
+        if msg is None:
+            msg = {"role": "system", "content": system_prompt}
+            self._system_msgs[system_prompt] = msg
+        return msg
+
+    def _ollama_payload(self, system_prompt: str, user_prompt: str) -> dict:
+        """Build the request payload for the Ollama /api/chat endpoint."""
+        return {
+            **self._ollama_base,
+            "messages": [
+                self._system_message(system_prompt),
+                {"role": "user", "content": user_prompt},
+            ],
         }
-        payload = {
-            "model": self.config.model,
+
+    def _consume_ollama_line(self, line: str, parts: list[str]) -> int | None:
+        """Process one streamed Ollama chunk; returns eval_count on the final one."""
+        chunk = orjson.loads(line)
+        content = chunk.get("message", {}).get("content", "")
+        if content:
+            parts.append(content)
+        if chunk.get("done"):
+            return chunk.get("eval_count", 0)
+        return None
+
+    def _openai_payload(self, system_prompt: str, user_prompt: str) -> dict:
+        """Build the request payload for an OpenAI-compatible chat endpoint."""
+        return {
+            **self._openai_base,
             "messages": [
-                {"role": "system", "content": system_prompt},
+                self._system_message(system_prompt),
                 {"role": "user", "content": user_prompt},
             ],
-            "max_tokens": self.config.max_tokens,
-            "temperature": self.config.temperature,
         }
 
+    def _consume_openai_line(self, line: str, parts: list[str]) -> int | None:
+        """Process one SSE line from an OpenAI stream; returns total_tokens if present."""
+        if not line.startswith("data:"):
+            return None
+        data = line[5:].strip()
+        if not data or data == "[DONE]":
+            return None
+        chunk = orjson.loads(data)
+        choices = chunk.get("choices")
+        if choices:
+            content = choices[0].get("delta", {}).get("content")
+            if content:
+                parts.append(content)
+        usage = chunk.get("usage")
+        if usage:
+            return usage.get("total_tokens", 0)
+        return None
+
+    def _call_ollama(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+        """Call the Ollama /api/chat endpoint, streaming the response."""
+        url = f"{self.config.base_url}/api/chat"
+        payload = self._ollama_payload(system_prompt, user_prompt)
+        parts: list[str] = []
+        tokens_used = 0
+
         try:
-            resp = self._client.post(url, json=payload, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
-            choice = data.get("choices", [{}])[0]
-            usage = data.get("usage", {})
-            return LLMResponse(
-                content=choice.get("message", {}).get("content", ""),
-                model=self.config.model,
-                tokens_used=usage.get("total_tokens", 0),
-                provider="openai",
-            )
-        except httpx.HTTPError as e:
+            with self._client.stream("POST", url, content=orjson.dumps(payload)) as resp:
+                resp.raise_for_status()
+                for line in resp.iter_lines():
+                    if line:
+                        tokens_used = self._consume_ollama_line(line, parts) or tokens_used
+        except self._httpx.HTTPError as e:
+            logger.error("Ollama error: %s", e)
+            raise RuntimeError(f"Ollama request failed: {e}") from e
+
+        return LLMResponse(
+            content="".join(parts),
+            model=self.config.model,
+            tokens_used=tokens_used,
+            provider="ollama",
+        )
+
+    async def _acall_ollama(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+        """Async call to the Ollama /api/chat endpoint, streaming the response."""
+        url = f"{self.config.base_url}/api/chat"
+        payload = self._ollama_payload(system_prompt, user_prompt)
+        parts: list[str] = []
+        tokens_used = 0
+
+        try:
+            async with self._async_client().stream("POST", url, content=orjson.dumps(payload)) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if line:
+                        tokens_used = self._consume_ollama_line(line, parts) or tokens_used
+        except self._httpx.HTTPError as e:
+            logger.error("Ollama error: %s", e)
+            raise RuntimeError(f"Ollama request failed: {e}") from e
+
+        return LLMResponse(
+            content="".join(parts),
+            model=self.config.model,
+            tokens_used=tokens_used,
+            provider="ollama",
+        )
+
+    def _call_openai(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+        """Call an OpenAI-compatible chat endpoint, streaming via SSE."""
+        url = f"{self.config.base_url}/v1/chat/completions"
+        payload = self._openai_payload(system_prompt, user_prompt)
+        parts: list[str] = []
+        tokens_used = 0
+
+        try:
+            with self._client.stream("POST", url, content=orjson.dumps(payload)) as resp:
+                resp.raise_for_status()
+                for line in resp.iter_lines():
+                    tokens_used = self._consume_openai_line(line, parts) or tokens_used
+        except self._httpx.HTTPError as e:
+            logger.error("OpenAI error: %s", e)
+            raise RuntimeError(f"OpenAI request failed: {e}") from e
+
+        return LLMResponse(
+            content="".join(parts),
+            model=self.config.model,
+            tokens_used=tokens_used,
+            provider=self.config.provider,
+        )
+
+    async def _acall_openai(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+        """Async call to an OpenAI-compatible chat endpoint, streaming via SSE."""
+        url = f"{self.config.base_url}/v1/chat/completions"
+        payload = self._openai_payload(system_prompt, user_prompt)
+        parts: list[str] = []
+        tokens_used = 0
+
+        try:
+            async with self._async_client().stream("POST", url, content=orjson.dumps(payload)) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    tokens_used = self._consume_openai_line(line, parts) or tokens_used
+        except self._httpx.HTTPError as e:
             logger.error("OpenAI error: %s", e)
             raise RuntimeError(f"OpenAI request failed: {e}") from e
 
+        return LLMResponse(
+            content="".join(parts),
+            model=self.config.model,
+            tokens_used=tokens_used,
+            provider=self.config.provider,
+        )
+
     def close(self) -> None:
-        """Close the HTTP client."""
+        """Close the HTTP clients."""
         self._client.close()
+        with self._loop_lock:
+            loop_clients = list(self._loop_clients.items())
+            self._loop_clients.clear()
+        for loop, client in loop_clients:
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            # Clients whose loop has already stopped are simply dropped:
+            # their connections can't be closed cleanly without the loop.
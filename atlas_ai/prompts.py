@@ -7,8 +7,72 @@ human-readable insights, summaries, and modernization recommendations.
 
 from __future__ import annotations
 
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
 from typing import Any
 
+import orjson
+
+# Prefill cost grows with prompt length (quadratically in attention), so very
+# large reports are truncated deterministically: findings to the top
+# ATLAS_AI_MAX_FINDINGS by severity, node types to the top _MAX_NODE_TYPES by
+# count, each with an explicit "omitted" tail so the model knows.
+_SEVERITY_WEIGHT = {"critical": 4, "high": 3, "medium": 2, "low": 1, "info": 0}
+# Severities come from a small fixed vocabulary; a dict lookup beats calling
+# str.upper() per finding in the hot loop (unknown values still fall back).
+_SEVERITY_LABEL = {sev: sev.upper() for sev in _SEVERITY_WEIGHT}
+_MAX_FINDINGS = int(os.environ.get("ATLAS_AI_MAX_FINDINGS", "25"))
+_MAX_NODE_TYPES = 10
+
+# Built prompts keyed by (builder name, report digest). Bounded LRU so a
+# long-lived stream consumer can't grow it without limit; the lock keeps
+# get/move_to_end/evict atomic, since builders run on worker threads.
+_PROMPT_CACHE: OrderedDict[tuple[str, bytes], str] = OrderedDict()
+_PROMPT_CACHE_MAX = 256
+_PROMPT_CACHE_LOCK = threading.Lock()
+
+
+def _report_key(report_json: dict[str, Any]) -> bytes | None:
+    """Stable digest of a report dict, or None if it can't be serialized."""
+    try:
+        payload = orjson.dumps(report_json, option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        return None
+    return hashlib.blake2b(payload).digest()
+
+
+def _cached_by_report(builder: Callable[[dict[str, Any]], str]) -> Callable[[dict[str, Any]], str]:
+    """Memoize a prompt builder on a stable hash of its report dict.
+
+    Retried or duplicate reports (common in stream mode) then skip the
+    string-assembly work entirely.
+    """
+    name = builder.__name__
+
+    @functools.wraps(builder)
+    def wrapper(report_json: dict[str, Any]) -> str:
+        digest = _report_key(report_json)
+        if digest is None:
+            return builder(report_json)
+        key = (name, digest)
+        with _PROMPT_CACHE_LOCK:
+            cached = _PROMPT_CACHE.get(key)
+            if cached is not None:
+                _PROMPT_CACHE.move_to_end(key)
+                return cached
+        prompt = builder(report_json)
+        with _PROMPT_CACHE_LOCK:
+            _PROMPT_CACHE[key] = prompt
+            if len(_PROMPT_CACHE) > _PROMPT_CACHE_MAX:
+                _PROMPT_CACHE.popitem(last=False)
+        return prompt
+
+    return wrapper
+
 
 SYSTEM_PROMPT = """You are PipelineAtlas AI — an expert CI/CD architecture advisor.
 
@@ -31,58 +95,145 @@ Rules:
 """
 
 
-def build_analysis_prompt(report_json: dict[str, Any]) -> str:
-    """Build a user prompt from a JSON report dict.
-
-    Args:
-        report_json: Output from atlas-report's JSON renderer.
+# Trailing instructions of the analysis prompt; constant across reports.
+_ANALYSIS_FOOTER = (
+    "\n---",
+    "Based on the analysis above, provide:",
+    "1. Executive Summary (2-3 sentences)",
+    "2. Modernization Roadmap (3-5 prioritized improvements)",
+    "3. Risk Assessment (what could break if left unaddressed)",
+)
 
-    Returns:
-        A formatted user prompt string for the LLM.
-    """
-    sections = []
 
+def _iter_report_sections(report_json: dict[str, Any]):
+    """Yield the data sections of a report (no trailing instructions)."""
     # Meta
     meta = report_json.get("meta", {})
-    sections.append(f"## Pipeline: {meta.get('name', 'Unknown')}")
-    sections.append(f"Platform: {meta.get('platform', 'unknown')}")
-    sections.append(f"Generated: {meta.get('generated_at', 'unknown')}")
+    yield f"## Pipeline: {meta.get('name', 'Unknown')}"
+    yield f"Platform: {meta.get('platform', 'unknown')}"
+    yield f"Generated: {meta.get('generated_at', 'unknown')}"
 
     # Scores
     scores = report_json.get("scores", {})
-    sections.append(f"\n## Scores")
-    sections.append(f"- Complexity: {scores.get('complexity_score', 'N/A')}/100")
-    sections.append(f"- Fragility: {scores.get('fragility_score', 'N/A')}/100")
+    yield "\n## Scores"
+    yield f"- Complexity: {scores.get('complexity_score', 'N/A')}/100"
+    yield f"- Fragility: {scores.get('fragility_score', 'N/A')}/100"
 
     # Structure
     structure = report_json.get("structure", {})
-    sections.append(f"\n## Structure")
-    sections.append(f"- Nodes: {structure.get('total_nodes', 0)}")
-    sections.append(f"- Edges: {structure.get('total_edges', 0)}")
+    yield "\n## Structure"
+    yield f"- Nodes: {structure.get('total_nodes', 0)}"
+    yield f"- Edges: {structure.get('total_edges', 0)}"
 
     nodes = structure.get("nodes_by_type", {})
-    if nodes:
-        for nt, count in nodes.items():
-            sections.append(f"  - {nt}: {count}")
+    omitted = len(nodes) - _MAX_NODE_TYPES
+    if omitted > 0:
+        nodes = dict(sorted(nodes.items(), key=lambda kv: kv[1], reverse=True)[:_MAX_NODE_TYPES])
+    for nt, count in nodes.items():
+        yield f"  - {nt}: {count}"
+    if omitted > 0:
+        yield f"  - (+{omitted} other node types omitted)"
 
     # Findings
     findings = report_json.get("findings", [])
     if findings:
-        sections.append(f"\n## Findings ({len(findings)} total)")
+        yield f"\n## Findings ({len(findings)} total)"
+        omitted = len(findings) - _MAX_FINDINGS
+        if omitted > 0:
+            findings = sorted(
+                findings,
+                key=lambda f: _SEVERITY_WEIGHT.get(f.get("severity", "info"), 0),
+                reverse=True,
+            )[:_MAX_FINDINGS]
+        label = _SEVERITY_LABEL.get
         for f in findings:
-            sections.append(
-                f"- [{f.get('severity', 'info').upper()}] {f.get('rule_id', '?')}: {f.get('message', '')}"
-            )
+            get = f.get
+            severity = get("severity", "info")
+            yield f"- [{label(severity) or severity.upper()}] {get('rule_id', '?')}: {get('message', '')}"
+        if omitted > 0:
+            yield f"- (+{omitted} lower-severity findings omitted)"
+
+
+def _iter_analysis_sections(report_json: dict[str, Any]):
+    """Yield the lines of the analysis prompt, one at a time."""
+    yield from _iter_report_sections(report_json)
+    yield from _ANALYSIS_FOOTER
+
+
+@_cached_by_report
+def build_analysis_prompt(report_json: dict[str, Any]) -> str:
+    """Build a user prompt from a JSON report dict.
+
+    Args:
+        report_json: Output from atlas-report's JSON renderer.
+
+    Returns:
+        A formatted user prompt string for the LLM.
+    """
+    return "\n".join(_iter_analysis_sections(report_json))
 
-    sections.append("\n---")
-    sections.append("Based on the analysis above, provide:")
-    sections.append("1. Executive Summary (2-3 sentences)")
-    sections.append("2. Modernization Roadmap (3-5 prioritized improvements)")
-    sections.append("3. Risk Assessment (what could break if left unaddressed)")
 
+@_cached_by_report
+def build_combined_prompt(report_json: dict[str, Any]) -> str:
+    """Build a single prompt covering both the roadmap and the executive summary.
+
+    Fusing both tasks into one request means the (shared) report context is
+    sent and prefilled once instead of twice. The model is instructed to
+    return a strict JSON object so the two outputs can be split apart again.
+
+    Args:
+        report_json: Output from atlas-report's JSON renderer.
+
+    Returns:
+        A formatted user prompt string for the LLM.
+    """
+    analysis = build_analysis_prompt(report_json)
+    summary = build_executive_summary_prompt(report_json)
+
+    return (
+        f"{analysis}\n\n"
+        f"Additionally: {summary}\n\n"
+        "---\n"
+        "Respond with ONLY a JSON object of this exact shape (no markdown fences,\n"
+        "no text outside the JSON):\n"
+        '{"roadmap": "<the full analysis in markdown>", '
+        '"executive_summary": "<the 2-3 sentence summary>"}'
+    )
+
+
+def build_batch_prompt(reports: list[dict[str, Any]]) -> str:
+    """Build one prompt covering several reports, amortizing prefill cost.
+
+    Each report's data sections are rendered under a numbered heading and the
+    model is asked for a JSON array with one object per report, in order, so
+    the shared instructions and model prefill are paid once per batch instead
+    of once per report.
+
+    Args:
+        reports: Report dicts from atlas-report's JSON renderer.
+
+    Returns:
+        A formatted user prompt string for the LLM.
+    """
+    sections: list[str] = []
+    for idx, report in enumerate(reports, start=1):
+        sections.append(f"# Report {idx}")
+        sections.extend(_iter_report_sections(report))
+        sections.append("")
+    sections.append("---")
+    sections.append(
+        f"You were given {len(reports)} reports above. Respond with ONLY a JSON array "
+        f"of exactly {len(reports)} objects, one per report in the same order, each of "
+        "this exact shape (no markdown fences, no text outside the JSON):"
+    )
+    sections.append(
+        '[{"roadmap": "<the full analysis in markdown>", '
+        '"executive_summary": "<the 2-3 sentence summary>"}, ...]'
+    )
     return "\n".join(sections)
 
 
+@_cached_by_report
 def build_executive_summary_prompt(report_json: dict[str, Any]) -> str:
     """Build a prompt specifically for generating a concise executive summary."""
     name = report_json.get("meta", {}).get("name", "Unknown Pipeline")
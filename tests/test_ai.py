@@ -1,12 +1,19 @@
 """Unit tests for atlas-ai — prompt builder, LLM client, advisor."""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import orjson
 import pytest
 
 from atlas_ai.llm_client import LLMClient, LLMConfig, LLMResponse
-from atlas_ai.prompts import SYSTEM_PROMPT, build_analysis_prompt, build_executive_summary_prompt
-from atlas_ai.advisor import ModernizationAdvisor, ModernizationResult
+from atlas_ai.prompts import (
+    SYSTEM_PROMPT,
+    build_analysis_prompt,
+    build_combined_prompt,
+    build_executive_summary_prompt,
+)
+from atlas_ai.advisor import ModernizationAdvisor, ModernizationResult, _split_combined_response
 
 # --- Sample report data ---
 SAMPLE_REPORT = {
@@ -45,20 +52,57 @@ class TestPrompts:
         assert "CI Workflow" in prompt
         assert "Findings: 2" in prompt
 
+    def test_prompt_cache_returns_same_object_for_equal_reports(self):
+        first = build_analysis_prompt(dict(SAMPLE_REPORT))
+        second = build_analysis_prompt(dict(SAMPLE_REPORT))
+        assert first is second
+
+    def test_prompt_cache_misses_on_different_reports(self):
+        other = {**SAMPLE_REPORT, "meta": {"name": "Other Pipeline"}}
+        assert build_analysis_prompt(SAMPLE_REPORT) != build_analysis_prompt(other)
+
+    def test_analysis_prompt_truncates_findings_by_severity(self):
+        report = {
+            **SAMPLE_REPORT,
+            "findings": [
+                {"rule_id": f"low-{i}", "severity": "low", "message": "minor"} for i in range(30)
+            ]
+            + [{"rule_id": "the-big-one", "severity": "critical", "message": "broken"}],
+        }
+        prompt = build_analysis_prompt(report)
+        assert "Findings (31 total)" in prompt
+        assert "the-big-one" in prompt
+        assert "(+6 lower-severity findings omitted)" in prompt
+
+    def test_build_combined_prompt(self):
+        prompt = build_combined_prompt(SAMPLE_REPORT)
+        assert "Modernization Roadmap" in prompt
+        assert "executive_summary" in prompt
+        assert "JSON" in prompt
+
+
+def _mock_streaming_client(mock_client_cls, lines):
+    """Wire a mocked httpx.Client whose stream() yields the given lines."""
+    mock_client = MagicMock()
+    mock_client_cls.return_value = mock_client
+    mock_resp = MagicMock()
+    mock_resp.iter_lines.return_value = iter(lines)
+    mock_client.stream.return_value.__enter__.return_value = mock_resp
+    return mock_client
+
 
 class TestLLMClient:
 
-    @patch("atlas_ai.llm_client.httpx.Client")
+    @patch("httpx.Client")
     def test_ollama_generate(self, mock_client_cls):
-        mock_client = MagicMock()
-        mock_client_cls.return_value = mock_client
-
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {
-            "message": {"content": "Here is the roadmap..."},
-            "eval_count": 150,
-        }
-        mock_client.post.return_value = mock_resp
+        _mock_streaming_client(
+            mock_client_cls,
+            [
+                orjson.dumps({"message": {"content": "Here is "}, "done": False}).decode(),
+                orjson.dumps({"message": {"content": "the roadmap..."}, "done": False}).decode(),
+                orjson.dumps({"message": {"content": ""}, "done": True, "eval_count": 150}).decode(),
+            ],
+        )
 
         config = LLMConfig(provider="ollama", model="mistral")
         client = LLMClient(config)
@@ -69,17 +113,17 @@ class TestLLMClient:
         assert response.tokens_used == 150
         assert response.provider == "ollama"
 
-    @patch("atlas_ai.llm_client.httpx.Client")
+    @patch("httpx.Client")
     def test_openai_generate(self, mock_client_cls):
-        mock_client = MagicMock()
-        mock_client_cls.return_value = mock_client
-
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {
-            "choices": [{"message": {"content": "Summary here"}}],
-            "usage": {"total_tokens": 200},
-        }
-        mock_client.post.return_value = mock_resp
+        _mock_streaming_client(
+            mock_client_cls,
+            [
+                'data: {"choices": [{"delta": {"content": "Summary "}}]}',
+                'data: {"choices": [{"delta": {"content": "here"}}]}',
+                'data: {"choices": [], "usage": {"total_tokens": 200}}',
+                "data: [DONE]",
+            ],
+        )
 
         config = LLMConfig(provider="openai", model="gpt-4", api_key="sk-test")
         client = LLMClient(config)
@@ -89,6 +133,80 @@ class TestLLMClient:
         assert response.tokens_used == 200
         assert response.provider == "openai"
 
+    @patch("httpx.Client")
+    def test_vllm_generate_uses_openai_protocol(self, mock_client_cls):
+        mock_client = _mock_streaming_client(
+            mock_client_cls,
+            [
+                'data: {"choices": [{"delta": {"content": "From vLLM"}}]}',
+                'data: {"choices": [], "usage": {"total_tokens": 42}}',
+                "data: [DONE]",
+            ],
+        )
+
+        config = LLMConfig(provider="vllm", base_url="http://localhost:8000", model="mistral")
+        client = LLMClient(config)
+        response = client.generate("system", "user prompt")
+
+        assert response.content == "From vLLM"
+        assert response.tokens_used == 42
+        assert response.provider == "vllm"
+        url = mock_client.stream.call_args[0][1]
+        assert url.endswith("/v1/chat/completions")
+
+    @patch("httpx.Client")
+    def test_generate_many_multi_prompt_single_request(self, mock_client_cls):
+        mock_client = MagicMock()
+        mock_client_cls.return_value = mock_client
+        mock_resp = MagicMock()
+        mock_resp.content = orjson.dumps(
+            {
+                "choices": [
+                    {"index": 1, "text": "second"},
+                    {"index": 0, "text": "first"},
+                ],
+                "usage": {"total_tokens": 100},
+            }
+        )
+        mock_client.post.return_value = mock_resp
+
+        config = LLMConfig(provider="openai", api_key="sk-test", multi_prompt=True)
+        client = LLMClient(config)
+        responses = client.generate_many("system", ["prompt a", "prompt b"])
+
+        assert mock_client.post.call_count == 1
+        assert [r.content for r in responses] == ["first", "second"]
+        assert all(r.tokens_used == 50 for r in responses)
+
+    @patch("httpx.AsyncClient")
+    @patch("httpx.Client")
+    def test_async_client_is_created_per_event_loop(self, _mock_client_cls, mock_aclient_cls):
+        mock_aclient_cls.side_effect = lambda **_kwargs: MagicMock()
+
+        client = LLMClient(LLMConfig())
+
+        async def _get():
+            return client._async_client()
+
+        first = asyncio.run(_get())
+        second = asyncio.run(_get())
+        assert first is not second
+
+    @patch("httpx.Client")
+    def test_repeated_prompt_served_from_cache(self, mock_client_cls):
+        mock_client = _mock_streaming_client(
+            mock_client_cls,
+            [orjson.dumps({"message": {"content": "cached"}, "done": True, "eval_count": 5}).decode()],
+        )
+
+        client = LLMClient(LLMConfig(provider="ollama"))
+        first = client.generate("system", "user prompt")
+        second = client.generate("system", "user prompt")
+
+        assert mock_client.stream.call_count == 1
+        assert second.content == first.content
+        assert second is not first
+
 
 class TestAdvisor:
 
@@ -97,10 +215,12 @@ class TestAdvisor:
         mock_client = MagicMock()
         mock_client_cls.return_value = mock_client
 
-        mock_client.generate.side_effect = [
-            LLMResponse(content="Roadmap content", model="mistral", tokens_used=100, provider="ollama"),
-            LLMResponse(content="Executive summary", model="mistral", tokens_used=50, provider="ollama"),
-        ]
+        mock_client.generate.return_value = LLMResponse(
+            content='{"roadmap": "Roadmap content", "executive_summary": "Executive summary"}',
+            model="mistral",
+            tokens_used=150,
+            provider="ollama",
+        )
 
         advisor = ModernizationAdvisor()
         result = advisor.analyze(SAMPLE_REPORT)
@@ -111,6 +231,25 @@ class TestAdvisor:
         assert result.tokens_used == 150
         assert result.model == "mistral"
 
+    @patch("atlas_ai.advisor.LLMClient")
+    def test_analyze_async(self, mock_client_cls):
+        mock_client = MagicMock()
+        mock_client_cls.return_value = mock_client
+        mock_client.agenerate = AsyncMock(
+            return_value=LLMResponse(
+                content='{"roadmap": "Roadmap content", "executive_summary": "Executive summary"}',
+                model="mistral",
+                tokens_used=150,
+                provider="ollama",
+            )
+        )
+
+        advisor = ModernizationAdvisor()
+        result = asyncio.run(advisor.analyze_async(SAMPLE_REPORT))
+
+        assert result.roadmap == "Roadmap content"
+        assert result.executive_summary == "Executive summary"
+
     @patch("atlas_ai.advisor.LLMClient")
     def test_generate_roadmap_only(self, mock_client_cls):
         mock_client = MagicMock()
@@ -125,3 +264,75 @@ class TestAdvisor:
         advisor = ModernizationAdvisor()
         roadmap = advisor.generate_roadmap(SAMPLE_REPORT)
         assert roadmap == "Just the roadmap"
+
+    @patch("atlas_ai.advisor.LLMClient")
+    def test_analyze_trivial_report_skips_llm(self, mock_client_cls):
+        mock_client = MagicMock()
+        mock_client_cls.return_value = mock_client
+
+        trivial = {
+            "meta": {"name": "Tiny Pipeline"},
+            "scores": {"complexity_score": 3.0, "fragility_score": 1.0},
+            "structure": {"total_nodes": 2, "total_edges": 1},
+            "findings": [],
+        }
+
+        advisor = ModernizationAdvisor()
+        result = advisor.analyze(trivial)
+
+        assert result.model == "deterministic"
+        assert result.tokens_used == 0
+        assert "Tiny Pipeline" in result.executive_summary
+        mock_client.generate.assert_not_called()
+
+    @patch("atlas_ai.advisor.LLMClient")
+    def test_analyze_batch(self, mock_client_cls):
+        mock_client = MagicMock()
+        mock_client_cls.return_value = mock_client
+        mock_client.generate.return_value = LLMResponse(
+            content='[{"roadmap": "R1", "executive_summary": "S1"},'
+            ' {"roadmap": "R2", "executive_summary": "S2"}]',
+            model="mistral",
+            tokens_used=300,
+            provider="ollama",
+        )
+
+        advisor = ModernizationAdvisor()
+        results = advisor.analyze_batch([SAMPLE_REPORT, SAMPLE_REPORT])
+
+        assert [r.roadmap for r in results] == ["R1", "R2"]
+        assert [r.executive_summary for r in results] == ["S1", "S2"]
+        assert all(r.tokens_used == 150 for r in results)
+        mock_client.generate.assert_called_once()
+
+    @patch("atlas_ai.advisor.LLMClient")
+    def test_analyze_batch_falls_back_per_report(self, mock_client_cls):
+        mock_client = MagicMock()
+        mock_client_cls.return_value = mock_client
+        mock_client.generate.return_value = LLMResponse(
+            content="not an array", model="mistral", tokens_used=10, provider="ollama"
+        )
+        mock_client.generate_many.return_value = [
+            LLMResponse(
+                content='{"roadmap": "R", "executive_summary": "S"}',
+                model="mistral",
+                tokens_used=100,
+                provider="ollama",
+            )
+        ] * 2
+
+        advisor = ModernizationAdvisor()
+        results = advisor.analyze_batch([SAMPLE_REPORT, SAMPLE_REPORT])
+
+        assert len(results) == 2
+        assert all(r.roadmap == "R" for r in results)
+        mock_client.generate_many.assert_called_once()
+
+    def test_split_combined_response_extracts_embedded_json(self):
+        content = 'Here you go:\n{"roadmap": "R", "executive_summary": "S"}\nDone.'
+        assert _split_combined_response(content) == ("R", "S")
+
+    def test_split_combined_response_falls_back_to_raw(self):
+        roadmap, summary = _split_combined_response("not json at all")
+        assert roadmap == "not json at all"
+        assert summary == ""
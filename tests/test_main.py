@@ -48,3 +48,11 @@ class TestMain:
     def test_stdin_mode_invalid_json_exits_nonzero(self):
         code, _, _ = _run("--mode", "stdin", stdin_data="not valid json")
         assert code != 0
+
+    def test_package_import_does_not_load_httpx(self):
+        result = subprocess.run(
+            [sys.executable, "-c", "import atlas_ai, sys; sys.exit('httpx' in sys.modules)"],
+            capture_output=True,
+            timeout=15,
+        )
+        assert result.returncode == 0